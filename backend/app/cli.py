@@ -0,0 +1,364 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import queue
+import sys
+import tarfile
+import tempfile
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp')
+
+logger = logging.getLogger("app.cli")
+
+# Per-process state, set up by _init_worker
+_worker = {}
+
+
+def iter_sources(source: Path, exclude: Optional[Path] = None) -> Iterator[Tuple[str, bytes]]:
+    """Yield (relative name, raw bytes) for every image in a directory, zip or tar archive"""
+    if source.is_dir():
+        exclude = exclude.resolve() if exclude is not None else None
+        for root, dirs, files in os.walk(source):
+            # Never read our own outputs back in when they live under the source
+            dirs[:] = sorted(d for d in dirs if exclude is None or (Path(root) / d).resolve() != exclude)
+            for filename in sorted(files):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    path = Path(root) / filename
+                    yield path.relative_to(source).as_posix(), path.read_bytes()
+
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTENSIONS):
+                    yield info.filename, archive.read(info)
+
+    elif tarfile.is_tarfile(source):
+        # Stream mode reads members sequentially without loading the index
+        with tarfile.open(source, "r|*") as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(IMAGE_EXTENSIONS):
+                    yield member.name, archive.extractfile(member).read()
+
+    else:
+        raise ValueError(f"Unsupported source (expected directory, zip or tar): {source}")
+
+
+def load_manifest(manifest_path: Path) -> Dict[str, str]:
+    """Return {output name: content hash} for outputs already written successfully"""
+    done = {}
+    if not manifest_path.exists():
+        return done
+
+    with open(manifest_path) as manifest:
+        for line in manifest:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # Partial line from an interrupted run
+                continue
+
+            output = entry.get("output")
+            if output is None:
+                continue
+            if entry.get("status") == "done":
+                done[output] = entry["sha256"]
+            else:
+                done.pop(output, None)
+
+    return done
+
+
+def output_name(name: str, output_format: str) -> str:
+    """Map a source name to its output name, dropping absolute and parent components"""
+    parts = [part for part in Path(name).parts if part not in ("/", "..", ".")]
+    return str(Path(*parts).with_suffix(f".{output_format}"))
+
+
+class OutputNames:
+    """Assign output names, disambiguating sources that would overwrite each other"""
+
+    def __init__(self, output_format: str):
+        self.output_format = output_format
+        self.claimed: Dict[str, str] = {}
+
+    def assign(self, name: str) -> str:
+        output = output_name(name, self.output_format)
+
+        if self.claimed.get(output, name) != name:
+            # a.jpg and a.png both map to a.png; keep the source extension in the second
+            # one and add a counter if that is taken too (a.JPG -> a_jpg_2.png)
+            path = Path(output_name(name, "x"))
+            suffix = Path(name).suffix.lower().lstrip(".")
+            stem = f"{path.stem}_{suffix}"
+            output = str(path.with_name(f"{stem}.{self.output_format}"))
+
+            counter = 2
+            while self.claimed.get(output, name) != name:
+                output = str(path.with_name(f"{stem}_{counter}.{self.output_format}"))
+                counter += 1
+
+        self.claimed[output] = name
+        return output
+
+
+def _prefetch(source: Path, output_dir: Path, done: Dict[str, str], names: OutputNames,
+              depth: int, stats: dict) -> Iterator[Tuple[str, str, bytes, str]]:
+    """Read and hash images on a background thread, skipping outputs already in the manifest"""
+    items: queue.Queue = queue.Queue(maxsize=depth)
+    sentinel = object()
+
+    def reader():
+        try:
+            for name, data in iter_sources(source, exclude=output_dir):
+                output = names.assign(name)
+                digest = hashlib.sha256(data).hexdigest()
+                if done.get(output) == digest and (output_dir / output).exists():
+                    stats["skipped"] += 1
+                    continue
+                items.put((name, output, data, digest))
+        except Exception as e:
+            items.put(e)
+        finally:
+            items.put(sentinel)
+
+    threading.Thread(target=reader, name="prefetch", daemon=True).start()
+
+    while True:
+        item = items.get()
+        if item is sentinel:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+def _load_pipeline():
+    """Create the remover and image service used for processing"""
+    from .models.background_remover import BackgroundRemover
+    from .services.image_service import ImageService
+
+    return BackgroundRemover(), ImageService()
+
+
+def _init_worker(quality: str, output_format: str, tmp_dir: str):
+    """Load the remover once per worker process"""
+    _worker["remover"], _worker["image_service"] = _load_pipeline()
+    _worker["quality"] = quality
+    _worker["format"] = output_format
+    _worker["tmp_dir"] = tmp_dir
+
+
+def _process_item(name: str, data: bytes, digest: str, output_path: str) -> Tuple[str, str, Optional[str]]:
+    """Remove background from one image and write it to output_path"""
+    image_service = _worker["image_service"]
+    tmp_dir = _worker["tmp_dir"]
+
+    if not image_service.validate_image(data):
+        return name, digest, "Invalid image file"
+
+    prefix = os.path.join(tmp_dir, f"{os.getpid()}_{digest}")
+    input_path = f"{prefix}_input{Path(name).suffix.lower()}"
+    result_path = f"{prefix}_output.png"
+
+    try:
+        with open(input_path, "wb") as buffer:
+            buffer.write(data)
+
+        _worker["remover"].remove_background(
+            input_path=input_path,
+            output_path=result_path,
+            quality=_worker["quality"]
+        )
+
+        with open(result_path, "rb") as result:
+            output = result.read()
+
+        if _worker["format"] != "png":
+            output = image_service.convert_format(output, _worker["format"])
+
+        _write_atomic(output_path, output)
+        return name, digest, None
+
+    except Exception as e:
+        return name, digest, str(e)
+
+    finally:
+        for path in (input_path, result_path):
+            if os.path.exists(path):
+                os.unlink(path)
+
+
+def _write_atomic(output_path: str, data: bytes):
+    """Write a file so an interrupted run never leaves a partial output"""
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    partial_path = f"{output_path}.part"
+    with open(partial_path, "wb") as buffer:
+        buffer.write(data)
+    os.replace(partial_path, output_path)
+
+
+def run(source: Path, output_dir: Path, workers: int, prefetch: int,
+        quality: str, output_format: str, manifest_path: Path,
+        report_every: float = 10.0) -> dict:
+    """
+    Process every image under source into output_dir
+
+    Args:
+        source: Directory, zip or tar archive of images
+        output_dir: Directory for processed images
+        workers: Number of processing worker processes
+        prefetch: Number of images read ahead of the workers
+        quality: Processing quality (low, medium, high)
+        output_format: Output format (png, jpg, webp)
+        manifest_path: JSON-lines manifest used to resume interrupted runs
+        report_every: Seconds between throughput reports
+
+    Returns:
+        Run statistics
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    done = load_manifest(manifest_path)
+    stats = {"processed": 0, "copied": 0, "failed": 0, "skipped": 0}
+
+    if done:
+        logger.info(f"Resuming: {len(done)} files already in manifest")
+
+    # Content already written under some output name, so duplicates can be copied
+    by_hash = {
+        digest: output for output, digest in done.items()
+        if (output_dir / output).exists()
+    }
+
+    started = time.monotonic()
+    last_report = started
+
+    def report(final: bool = False):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        rate = (stats["processed"] + stats["copied"]) / elapsed
+        logger.info(
+            f"{'Finished' if final else 'Progress'}: {stats['processed']} processed, "
+            f"{stats['copied']} copied, {stats['failed']} failed, {stats['skipped']} skipped, "
+            f"{rate:.2f} images/s, {elapsed:.0f}s elapsed"
+        )
+
+    with open(manifest_path, "a") as manifest, \
+            tempfile.TemporaryDirectory(prefix="bgremove_") as tmp_dir, \
+            ProcessPoolExecutor(workers, initializer=_init_worker,
+                                initargs=(quality, output_format, tmp_dir)) as pool:
+
+        def record(name: str, output: str, digest: str, error: Optional[str], **extra):
+            nonlocal last_report
+            entry = {"name": name, "sha256": digest, "output": output}
+            if error is None:
+                entry.update(status="done", **extra)
+                by_hash.setdefault(digest, output)
+            else:
+                stats["failed"] += 1
+                entry.update(status="failed", error=error)
+                logger.warning(f"Failed {name}: {error}")
+
+            manifest.write(json.dumps(entry) + "\n")
+            manifest.flush()
+
+            if time.monotonic() - last_report >= report_every:
+                report()
+                last_report = time.monotonic()
+
+        def collect(task):
+            future, output = task
+            name, digest, error = future.result()
+            if error is None:
+                stats["processed"] += 1
+            record(name, output, digest, error)
+
+        # Keep a bounded number of tasks in flight so memory does not grow with the input size
+        pending = deque()
+        max_in_flight = workers * 2
+
+        for name, output, data, digest in _prefetch(source, output_dir, done, OutputNames(output_format),
+                                                     prefetch, stats):
+            output_path = output_dir / output
+
+            # Same bytes already processed under another name: copy instead of reprocessing
+            existing = by_hash.get(digest)
+            if existing is not None and existing != output and (output_dir / existing).exists():
+                _write_atomic(str(output_path), (output_dir / existing).read_bytes())
+                stats["copied"] += 1
+                record(name, output, digest, None, copied_from=existing)
+                continue
+
+            pending.append((pool.submit(_process_item, name, data, digest, str(output_path)), output))
+
+            while len(pending) >= max_in_flight:
+                collect(pending.popleft())
+
+        while pending:
+            collect(pending.popleft())
+
+    report(final=True)
+    return stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m app.cli",
+        description="Remove backgrounds from a directory or archive of images offline"
+    )
+    parser.add_argument("source", type=Path, help="Directory, zip or tar archive of images")
+    parser.add_argument("output", type=Path, help="Output directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processing worker processes (default: CPU count)")
+    parser.add_argument("--prefetch", type=int, default=64,
+                        help="Images read ahead of the workers (default: 64)")
+    parser.add_argument("--quality", choices=["low", "medium", "high"], default="high",
+                        help="Processing quality (default: high)")
+    parser.add_argument("--format", choices=["png", "jpg", "webp"], default="png",
+                        help="Output format (default: png)")
+    parser.add_argument("--manifest", type=Path, default=None,
+                        help="Resume manifest (default: <output>/manifest.jsonl)")
+    parser.add_argument("--report-every", type=float, default=10.0,
+                        help="Seconds between throughput reports (default: 10)")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+
+    if not args.source.exists():
+        parser.error(f"Source not found: {args.source}")
+
+    try:
+        stats = run(
+            source=args.source,
+            output_dir=args.output,
+            workers=max(1, args.workers),
+            prefetch=max(1, args.prefetch),
+            quality=args.quality,
+            output_format=args.format,
+            manifest_path=args.manifest or args.output / "manifest.jsonl",
+            report_every=args.report_every
+        )
+    except KeyboardInterrupt:
+        logger.warning("Interrupted, rerun the same command to resume")
+        return 130
+    except BrokenProcessPool as e:
+        # Also raised when the remover fails to load in the worker initializer
+        logger.error(f"Worker process failed: {e}")
+        return 1
+    except ValueError as e:
+        logger.error(str(e))
+        return 2
+
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
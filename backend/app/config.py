@@ -33,10 +33,25 @@ class Settings(BaseSettings):
     rate_limit_per_minute: int = 10
     rate_limit_per_hour: int = 100
     
+    # Latency SLO / Admission Control
+    latency_slo_seconds: float = 8.0
+    latency_window_seconds: float = 60.0
+    processing_workers: Optional[int] = None  # concurrent remover calls, defaults to CPU count
+    admission_policies: dict = {}  # per-plan overrides, e.g. {"free": {"shed_at": 0.8}}
+    
     # AI Model Settings
     model_name: str = "u2net"
     processing_quality: str = "high"
     
+    # Video Settings
+    max_video_file_size: int = 100 * 1024 * 1024  # 100MB
+    video_keyframe_interval: int = 30
+    video_motion_threshold: float = 12.0
+    video_max_frames: int = 1800
+    video_max_frame_dimension: int = 4096
+    video_max_frame_bytes: int = 20 * 1024 * 1024  # 20MB uncompressed per ZIP entry
+    video_timeout_seconds: float = 840.0  # below the 900s proxy read timeout
+    
     # External Services
     google_analytics_id: Optional[str] = None
     adsense_id: Optional[str] = None
@@ -2,6 +2,7 @@ from fastapi import FastAPI, HTTPException, Depends, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 import os
 import uuid
@@ -10,7 +11,9 @@ from typing import Optional
 
 from .models.background_remover import BackgroundRemover
 from .services.image_service import ImageService
+from .services.video_service import VideoService
 from .utils.rate_limiter import RateLimiter
+from .utils.admission_controller import AdmissionController
 from .utils.file_validator import FileValidator
 from .config import settings
 
@@ -41,6 +44,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=[
+        "X-Processed-By",
+        "X-Quality-Tier",
+        "X-Processing-Quality",
+        "X-Frames-Processed",
+        "X-Keyframes",
+        "Retry-After"
+    ],
 )
 
 # Mount static files
@@ -51,6 +62,31 @@ background_remover = BackgroundRemover()
 image_service = ImageService()
 rate_limiter = RateLimiter()
 file_validator = FileValidator()
+admission_controller = AdmissionController(
+    plans=rate_limiter.limits.keys(),
+    slo_seconds=settings.latency_slo_seconds,
+    window_seconds=settings.latency_window_seconds,
+    workers=settings.processing_workers,
+    policies=settings.admission_policies
+)
+video_service = VideoService(
+    background_remover,
+    keyframe_interval=settings.video_keyframe_interval,
+    motion_threshold=settings.video_motion_threshold,
+    max_frames=settings.video_max_frames,
+    max_frame_dimension=settings.video_max_frame_dimension,
+    max_frame_bytes=settings.video_max_frame_bytes,
+    timeout_seconds=settings.video_timeout_seconds
+)
+
+def get_user_plan() -> str:
+    """
+    Plan used for admission control
+    
+    There are no user accounts yet, so every caller gets the free policy.
+    The plan must come from the caller's identity, never from the request.
+    """
+    return "free"
 
 @app.get("/")
 async def root():
@@ -73,10 +109,14 @@ async def remove_background(
     quality: Optional[str] = "high",
     format: Optional[str] = "png"
 ):
-    print(f"Received request: file={file.filename}, quality={quality}, format={format}")
     """
     Remove background from uploaded image
     
+    When the latency SLO is at risk the request may be downgraded to a
+    cheaper quality or rejected with 503, depending on the plan policy.
+    The admission tier (full, downgraded, shed) is returned in the
+    X-Quality-Tier header and the quality used in X-Processing-Quality.
+    
     Args:
         file: Image file to process
         quality: Processing quality (low, medium, high)
@@ -96,30 +136,47 @@ async def remove_background(
         # Check rate limits (implement based on user plan)
         # rate_limiter.check_limit(user_id)
         
-        # Generate unique filename
-        file_id = str(uuid.uuid4())
-        input_path = UPLOAD_DIR / f"{file_id}_input.{file.filename.split('.')[-1]}"
-        output_path = UPLOAD_DIR / f"{file_id}_output.{format}"
-        
-        # Save uploaded file
-        with open(input_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Admission control against the latency SLO
+        decision = admission_controller.admit(get_user_plan(), quality)
+        if not decision["admitted"]:
+            raise HTTPException(
+                status_code=503,
+                detail="Service overloaded, please retry shortly",
+                headers={
+                    "Retry-After": str(decision["retry_after"]),
+                    "X-Quality-Tier": decision["tier"]
+                }
+            )
         
-        # Process image
         try:
-            background_remover.remove_background(
-                input_path=str(input_path),
-                output_path=str(output_path),
-                quality=quality
-            )
-        except Exception as e:
-            # Clean up files
-            if input_path.exists():
-                input_path.unlink()
-            if output_path.exists():
-                output_path.unlink()
-            raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+            # Generate unique filename
+            file_id = str(uuid.uuid4())
+            input_path = UPLOAD_DIR / f"{file_id}_input.{file.filename.split('.')[-1]}"
+            output_path = UPLOAD_DIR / f"{file_id}_output.{format}"
+            
+            # Save uploaded file
+            with open(input_path, "wb") as buffer:
+                content = await file.read()
+                buffer.write(content)
+            
+            # Process image off the event loop once a processing slot is free
+            try:
+                async with admission_controller.processing_slot(decision):
+                    await run_in_threadpool(
+                        background_remover.remove_background,
+                        input_path=str(input_path),
+                        output_path=str(output_path),
+                        quality=decision["quality"]
+                    )
+            except Exception as e:
+                # Clean up files
+                if input_path.exists():
+                    input_path.unlink()
+                if output_path.exists():
+                    output_path.unlink()
+                raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+        finally:
+            admission_controller.finish(decision)
         
         # Clean up input file
         if input_path.exists():
@@ -130,7 +187,11 @@ async def remove_background(
             path=str(output_path),
             media_type=f"image/{format}",
             filename=f"background_removed.{format}",
-            headers={"X-Processed-By": "AI Background Remover"}
+            headers={
+                "X-Processed-By": "AI Background Remover",
+                "X-Quality-Tier": decision["tier"],
+                "X-Processing-Quality": decision["quality"]
+            }
         )
         
     except HTTPException:
@@ -167,6 +228,112 @@ async def batch_remove_background(files: list[UploadFile] = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.post("/api/remove-background-video")
+async def remove_background_video(
+    file: UploadFile = File(...),
+    quality: Optional[str] = "high",
+    format: Optional[str] = "webm"
+):
+    """
+    Remove background from a short video clip or a ZIP of image frames
+    
+    Full segmentation runs only on keyframes; masks for the frames in
+    between are propagated with optical flow. Clips go through the same
+    admission control as images and hold a processing slot while running.
+    
+    Args:
+        file: Video file (mp4, mov, webm, mkv, avi) or ZIP of frames
+        quality: Processing quality for keyframes (low, medium, high)
+        format: Output format (webm with alpha, zip of PNG frames)
+    
+    Returns:
+        Processed video or PNG sequence archive
+    """
+    try:
+        if format not in ("webm", "zip"):
+            raise HTTPException(status_code=400, detail="Unsupported output format (use webm or zip)")
+        
+        # Validate file
+        if not file_validator.is_valid_video(file):
+            raise HTTPException(status_code=400, detail="Invalid video file")
+        
+        if not file_validator.is_valid_size(file, settings.max_video_file_size):
+            raise HTTPException(
+                status_code=400,
+                detail=f"File too large (max {settings.max_video_file_size // (1024 * 1024)}MB)"
+            )
+        
+        # Admission control against the latency SLO; clip duration is not an
+        # image latency sample, but the slot it holds shows up as queue wait
+        decision = admission_controller.admit(get_user_plan(), quality, record_latency=False)
+        if not decision["admitted"]:
+            raise HTTPException(
+                status_code=503,
+                detail="Service overloaded, please retry shortly",
+                headers={
+                    "Retry-After": str(decision["retry_after"]),
+                    "X-Quality-Tier": decision["tier"]
+                }
+            )
+        
+        try:
+            # Generate unique filename
+            file_id = str(uuid.uuid4())
+            input_path = UPLOAD_DIR / f"{file_id}_input.{file.filename.split('.')[-1]}"
+            output_path = UPLOAD_DIR / f"{file_id}_output.{format}"
+            
+            # Stream upload to disk in chunks
+            with open(input_path, "wb") as buffer:
+                while chunk := await file.read(1024 * 1024):
+                    buffer.write(chunk)
+            
+            # Process video off the event loop once a processing slot is free
+            try:
+                async with admission_controller.processing_slot(decision):
+                    stats = await run_in_threadpool(
+                        video_service.process,
+                        input_path=str(input_path),
+                        output_path=str(output_path),
+                        output_format=format,
+                        quality=decision["quality"]
+                    )
+            except Exception as e:
+                # Clean up files
+                if input_path.exists():
+                    input_path.unlink()
+                if output_path.exists():
+                    output_path.unlink()
+                if isinstance(e, TimeoutError):
+                    raise HTTPException(status_code=504, detail=f"Processing timed out: {str(e)}")
+                if isinstance(e, ValueError):
+                    raise HTTPException(status_code=400, detail=f"Invalid video: {str(e)}")
+                raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
+        finally:
+            admission_controller.finish(decision)
+        
+        # Clean up input file
+        if input_path.exists():
+            input_path.unlink()
+        
+        # Return processed video
+        return FileResponse(
+            path=str(output_path),
+            media_type="video/webm" if format == "webm" else "application/zip",
+            filename=f"background_removed.{format}",
+            headers={
+                "X-Processed-By": "AI Background Remover",
+                "X-Quality-Tier": decision["tier"],
+                "X-Processing-Quality": decision["quality"],
+                "X-Frames-Processed": str(stats["frames"]),
+                "X-Keyframes": str(stats["keyframes"])
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
 @app.get("/api/status")
 async def get_status():
     """Get service status and statistics"""
@@ -174,9 +341,11 @@ async def get_status():
         "status": "operational",
         "uptime": "99.9%",
         "version": "1.0.0",
+        "admission": admission_controller.get_stats(),
         "features": [
             "background_removal",
             "batch_processing",
+            "video_processing",
             "multiple_formats",
             "high_quality"
         ]
@@ -0,0 +1,187 @@
+import cv2
+import numpy as np
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+class BufferPool:
+    """Thread-safe pool of preallocated arrays keyed by shape and dtype"""
+
+    def __init__(self, max_per_key: int = 8):
+        self.logger = logging.getLogger(__name__)
+
+        # Idle buffers kept per (shape, dtype); extras are dropped on release
+        self.max_per_key = max_per_key
+
+        self._free: Dict[Tuple[tuple, str], List[np.ndarray]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+        self.stats = {"allocations": 0, "reuses": 0, "dropped": 0}
+
+    def acquire(self, shape: Sequence[int], dtype=np.float32) -> np.ndarray:
+        """Get an uninitialised buffer, reusing an idle one when available"""
+        key = (tuple(shape), np.dtype(dtype).str)
+
+        with self._lock:
+            free = self._free[key]
+            if free:
+                self.stats["reuses"] += 1
+                return free.pop()
+            self.stats["allocations"] += 1
+
+        return np.empty(key[0], dtype=dtype)
+
+    def release(self, array: np.ndarray):
+        """Return a buffer to the pool"""
+        key = (array.shape, array.dtype.str)
+
+        with self._lock:
+            free = self._free[key]
+            if len(free) < self.max_per_key:
+                free.append(array)
+            else:
+                self.stats["dropped"] += 1
+
+    @contextmanager
+    def borrow(self, shape: Sequence[int], dtype=np.float32):
+        """Acquire a buffer for the duration of a with block"""
+        array = self.acquire(shape, dtype)
+        try:
+            yield array
+        finally:
+            self.release(array)
+
+    def clear(self):
+        """Drop all idle buffers"""
+        with self._lock:
+            self._free.clear()
+
+
+class TensorPreprocessor:
+    """Allocation-free tensor preparation and mask postprocessing for segmentation models"""
+
+    def __init__(
+        self,
+        input_size: Tuple[int, int] = (320, 320),
+        mean: Tuple[float, float, float] = (0.485, 0.456, 0.406),
+        std: Tuple[float, float, float] = (0.229, 0.224, 0.225),
+        max_batch_size: int = 8,
+        pool: Optional[BufferPool] = None
+    ):
+        self.logger = logging.getLogger(__name__)
+
+        # Model input size as (width, height)
+        self.input_size = input_size
+        self.pool = pool or BufferPool()
+
+        # Batches are staged in one fixed-size buffer so the pool holds a single batch shape
+        self.max_batch_size = max_batch_size
+
+        # (x / 255 - mean) / std folded into a single multiply-add per channel
+        std = np.asarray(std, dtype=np.float32)
+        self.scale = (1.0 / (255.0 * std)).astype(np.float32)
+        self.offset = (-np.asarray(mean, dtype=np.float32) / std).astype(np.float32)
+
+    @property
+    def tensor_shape(self) -> Tuple[int, int, int]:
+        """CHW shape of a single prepared image"""
+        width, height = self.input_size
+        return (3, height, width)
+
+    def prepare(self, image: np.ndarray) -> np.ndarray:
+        """
+        Convert an RGB uint8 image into a normalised 1x3xHxW float32 tensor
+
+        The tensor comes from the pool; pass it to release() when the model
+        has consumed it, or use prepared() instead.
+        """
+        tensor = self.pool.acquire((1,) + self.tensor_shape, np.float32)
+        self._prepare_into(image, tensor[0])
+        return tensor
+
+    def prepare_batch(self, images: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Stack RGB uint8 images into a pooled Nx3xHxW float32 staging array
+
+        The result is a view of a max_batch_size staging buffer; pass it to
+        release() when done.
+        """
+        if not 0 < len(images) <= self.max_batch_size:
+            raise ValueError(f"Batch size must be between 1 and {self.max_batch_size}, got {len(images)}")
+
+        staging = self.pool.acquire((self.max_batch_size,) + self.tensor_shape, np.float32)
+        for index, image in enumerate(images):
+            self._prepare_into(image, staging[index])
+        return staging[:len(images)]
+
+    @contextmanager
+    def prepared(self, images):
+        """Prepare one image or a list of images and release the tensor afterwards"""
+        if isinstance(images, np.ndarray):
+            tensor = self.prepare(images)
+        else:
+            tensor = self.prepare_batch(images)
+        try:
+            yield tensor
+        finally:
+            self.release(tensor)
+
+    def release(self, array: np.ndarray):
+        """Return a prepared tensor (or a batch view of one) to the pool"""
+        self.pool.release(array if array.base is None else array.base)
+
+    def postprocess(self, prediction: np.ndarray, size: Tuple[int, int],
+                    out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Turn a raw model prediction into a uint8 mask of the given (width, height)
+
+        A float32 prediction is min-max scaled in place, so it must not be
+        reused; other dtypes are staged in a pooled buffer. The mask is
+        written into out when given, otherwise a new array is returned.
+        """
+        prediction = prediction.reshape(prediction.shape[-2:])
+        width, height = size
+
+        if out is None:
+            out = np.empty((height, width), dtype=np.uint8)
+        elif out.shape != (height, width) or out.dtype != np.uint8:
+            raise ValueError(f"out must be a {height}x{width} uint8 array")
+
+        with self.pool.borrow(prediction.shape, np.float32) as staging, \
+                self.pool.borrow(prediction.shape, np.uint8) as small_mask:
+            if prediction.dtype != np.float32:
+                np.copyto(staging, prediction, casting="unsafe")
+                prediction = staging
+
+            # Min-max scale straight to 0-255, rounding before truncation
+            low = float(prediction.min())
+            high = float(prediction.max())
+            prediction -= low
+            prediction *= 255.0 / (high - low) if high > low else 0.0
+            prediction += 0.5
+
+            # Quantise at model resolution, then upsample the small uint8 mask
+            np.copyto(small_mask, prediction, casting="unsafe")
+            cv2.resize(small_mask, (width, height), dst=out, interpolation=cv2.INTER_LINEAR)
+
+        return out
+
+    def _prepare_into(self, image: np.ndarray, out: np.ndarray):
+        """Resize, normalise and transpose one image into a 3xHxW float32 view"""
+        if image.ndim != 3 or image.shape[2] not in (3, 4):
+            raise ValueError(f"Expected an RGB image, got shape {image.shape}")
+
+        width, height = self.input_size
+        channels = image.shape[2]
+
+        # RGBA is resized with its alpha and the alpha plane is ignored below
+        with self.pool.borrow((height, width, channels), np.uint8) as resized:
+            cv2.resize(image, (width, height), dst=resized, interpolation=cv2.INTER_LINEAR)
+
+            # Writing each channel into its CHW plane fuses the transpose with the float conversion
+            for channel in range(3):
+                plane = out[channel]
+                np.multiply(resized[:, :, channel], self.scale[channel], out=plane, dtype=np.float32)
+                plane += self.offset[channel]
@@ -0,0 +1,356 @@
+import cv2
+import numpy as np
+import io
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+import zipfile
+from PIL import Image
+from typing import Iterator, Optional
+import logging
+
+class VideoService:
+    """Service for removing backgrounds from video clips and frame sequences"""
+
+    def __init__(self, background_remover, keyframe_interval: int = 30,
+                 motion_threshold: float = 12.0, max_frames: int = 1800,
+                 max_frame_dimension: int = 4096, max_frame_bytes: int = 20 * 1024 * 1024,
+                 timeout_seconds: float = 840.0):
+        self.logger = logging.getLogger(__name__)
+        self.background_remover = background_remover
+
+        # Run full segmentation at least every N frames
+        self.keyframe_interval = keyframe_interval
+
+        # Mean absolute difference (0-255) that forces a new keyframe
+        self.motion_threshold = motion_threshold
+
+        # Hard cap on frames per clip
+        self.max_frames = max_frames
+
+        # Frames wider or taller than this are rejected before decoding
+        self.max_frame_dimension = max_frame_dimension
+
+        # Largest uncompressed ZIP entry accepted for an image sequence
+        self.max_frame_bytes = max_frame_bytes
+
+        # Wall-clock budget per clip, kept below the proxy read timeout
+        self.timeout_seconds = timeout_seconds
+
+        # Frames are compared at this width to keep motion/flow cheap
+        self.analysis_width = 320
+
+    def process(self, input_path: str, output_path: str,
+                output_format: str = "webm", quality: str = "high") -> dict:
+        """
+        Remove background from a video clip or a ZIP of frames
+
+        Args:
+            input_path: Video file or ZIP archive of image frames
+            output_path: Destination file
+            output_format: Output format (webm, zip)
+            quality: Processing quality passed to the remover on keyframes
+
+        Returns:
+            Processing statistics
+        """
+        if output_format not in ("webm", "zip"):
+            raise ValueError(f"Unsupported video output format: {output_format}")
+
+        if zipfile.is_zipfile(input_path):
+            frames = self._iter_sequence_frames(input_path)
+            fps = 25.0
+        else:
+            fps = self._get_fps(input_path)
+            frames = self._iter_video_frames(input_path)
+
+        if output_format == "webm":
+            writer = _WebMWriter(output_path, fps)
+        else:
+            writer = _PNGSequenceWriter(output_path)
+
+        stats = {"frames": 0, "keyframes": 0, "propagated": 0}
+        deadline = time.monotonic() + self.timeout_seconds
+
+        with tempfile.TemporaryDirectory() as work_dir:
+            try:
+                prev_gray = None
+                prev_mask = None
+                since_keyframe = 0
+
+                for frame in frames:
+                    if stats["frames"] >= self.max_frames:
+                        self.logger.warning(f"Frame limit reached ({self.max_frames}), truncating clip")
+                        break
+
+                    if time.monotonic() > deadline:
+                        raise TimeoutError(f"Video processing exceeded {self.timeout_seconds:.0f}s")
+
+                    gray = self._analysis_gray(frame)
+
+                    if (prev_mask is None
+                            or since_keyframe >= self.keyframe_interval
+                            or gray.shape != prev_gray.shape
+                            or self._motion_score(prev_gray, gray) > self.motion_threshold):
+                        mask = self._segment(frame, work_dir, quality)
+                        stats["keyframes"] += 1
+                        since_keyframe = 0
+                    else:
+                        mask = self._propagate_mask(prev_mask, prev_gray, gray)
+                        stats["propagated"] += 1
+
+                    since_keyframe += 1
+                    stats["frames"] += 1
+
+                    writer.write(frame, mask)
+                    prev_gray = gray
+                    prev_mask = mask
+
+                writer.close()
+            except Exception:
+                writer.abort()
+                raise
+
+        if stats["frames"] == 0:
+            raise ValueError("No decodable frames found")
+
+        self.logger.info(
+            f"Video processed: {stats['frames']} frames, "
+            f"{stats['keyframes']} keyframes, {stats['propagated']} propagated"
+        )
+        return stats
+
+    def _get_fps(self, input_path: str) -> float:
+        """Read the frame rate of a video, falling back to 25 fps"""
+        capture = cv2.VideoCapture(input_path)
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS)
+        finally:
+            capture.release()
+        return fps if fps and fps > 0 else 25.0
+
+    def _iter_video_frames(self, input_path: str) -> Iterator[np.ndarray]:
+        """Decode video frames one at a time"""
+        capture = cv2.VideoCapture(input_path)
+        if not capture.isOpened():
+            raise ValueError("Unable to open video file")
+
+        try:
+            width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+            self._check_dimensions(width, height, "video")
+
+            while True:
+                ok, frame = capture.read()
+                if not ok:
+                    break
+                if frame.shape[0] > self.max_frame_dimension or frame.shape[1] > self.max_frame_dimension:
+                    raise ValueError(f"Video frame too large: {frame.shape[1]}x{frame.shape[0]}")
+                yield frame
+        finally:
+            capture.release()
+
+    def _iter_sequence_frames(self, input_path: str) -> Iterator[np.ndarray]:
+        """Decode image frames from a ZIP archive in filename order"""
+        image_extensions = ('.jpg', '.jpeg', '.png', '.webp', '.bmp')
+
+        with zipfile.ZipFile(input_path) as archive:
+            entries = sorted(
+                (info for info in archive.infolist()
+                 if info.filename.lower().endswith(image_extensions)
+                 and not info.filename.startswith('__MACOSX')),
+                key=lambda info: self._frame_sort_key(info.filename)
+            )
+
+            for info in entries:
+                if info.file_size > self.max_frame_bytes:
+                    raise ValueError(f"Frame {info.filename} too large ({info.file_size} bytes uncompressed)")
+
+                data = archive.read(info)
+
+                # Check dimensions from the header before allocating the decoded frame
+                try:
+                    with Image.open(io.BytesIO(data)) as header:
+                        self._check_dimensions(header.width, header.height, info.filename)
+                except Image.DecompressionBombError:
+                    raise ValueError(f"Frame {info.filename} exceeds {self.max_frame_dimension}px limit")
+                except OSError:
+                    self.logger.warning(f"Skipping undecodable frame: {info.filename}")
+                    continue
+
+                frame = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+                if frame is None:
+                    self.logger.warning(f"Skipping undecodable frame: {info.filename}")
+                    continue
+                yield frame
+
+    @staticmethod
+    def _frame_sort_key(name: str) -> list:
+        """Natural sort key so frame_2 comes before frame_10"""
+        return [(0, int(part), "") if part.isdigit() else (1, 0, part.lower())
+                for part in re.split(r"(\d+)", name)]
+
+    def _check_dimensions(self, width: int, height: int, name: str):
+        """Reject frames above the maximum resolution"""
+        if width > self.max_frame_dimension or height > self.max_frame_dimension:
+            raise ValueError(
+                f"Frame size {width}x{height} of {name} exceeds {self.max_frame_dimension}px limit"
+            )
+
+    def _analysis_gray(self, frame: np.ndarray) -> np.ndarray:
+        """Downscaled grayscale copy used for motion scoring and optical flow"""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        height, width = gray.shape
+        if width > self.analysis_width:
+            new_height = max(1, int(height * self.analysis_width / width))
+            gray = cv2.resize(gray, (self.analysis_width, new_height), interpolation=cv2.INTER_AREA)
+        return gray
+
+    def _motion_score(self, prev_gray: np.ndarray, gray: np.ndarray) -> float:
+        """Mean absolute pixel difference between consecutive frames"""
+        return float(cv2.absdiff(prev_gray, gray).mean())
+
+    def _segment(self, frame: np.ndarray, work_dir: str, quality: str) -> np.ndarray:
+        """Run full background removal on a keyframe and return its alpha mask"""
+        input_path = os.path.join(work_dir, "keyframe_input.png")
+        output_path = os.path.join(work_dir, "keyframe_output.png")
+
+        cv2.imwrite(input_path, frame)
+        self.background_remover.remove_background(
+            input_path=input_path,
+            output_path=output_path,
+            quality=quality
+        )
+
+        result = cv2.imread(output_path, cv2.IMREAD_UNCHANGED)
+        if result is None:
+            raise ValueError("Background remover produced no output")
+
+        if result.ndim == 3 and result.shape[2] == 4:
+            mask = result[:, :, 3]
+        else:
+            mask = np.full(frame.shape[:2], 255, dtype=np.uint8)
+
+        if mask.shape != frame.shape[:2]:
+            mask = cv2.resize(mask, (frame.shape[1], frame.shape[0]), interpolation=cv2.INTER_LINEAR)
+
+        return np.ascontiguousarray(mask)
+
+    def _propagate_mask(self, prev_mask: np.ndarray, prev_gray: np.ndarray,
+                        gray: np.ndarray) -> np.ndarray:
+        """Warp the previous mask onto the current frame using dense optical flow"""
+        # Backward flow: for each pixel of the current frame, where it was in the previous one
+        flow = cv2.calcOpticalFlowFarneback(
+            gray, prev_gray, None,
+            pyr_scale=0.5, levels=3, winsize=15,
+            iterations=3, poly_n=5, poly_sigma=1.2, flags=0
+        )
+
+        mask_height, mask_width = prev_mask.shape
+        flow_height, flow_width = flow.shape[:2]
+
+        # Upscale the flow field to full resolution
+        if (flow_height, flow_width) != (mask_height, mask_width):
+            flow = cv2.resize(flow, (mask_width, mask_height), interpolation=cv2.INTER_LINEAR)
+            flow[:, :, 0] *= mask_width / flow_width
+            flow[:, :, 1] *= mask_height / flow_height
+
+        grid_x, grid_y = np.meshgrid(
+            np.arange(mask_width, dtype=np.float32),
+            np.arange(mask_height, dtype=np.float32)
+        )
+        flow[:, :, 0] += grid_x
+        flow[:, :, 1] += grid_y
+
+        return cv2.remap(
+            prev_mask, flow[:, :, 0], flow[:, :, 1],
+            interpolation=cv2.INTER_LINEAR,
+            borderMode=cv2.BORDER_REPLICATE
+        )
+
+
+class _WebMWriter:
+    """Stream RGBA frames into ffmpeg as VP9 WebM with an alpha channel"""
+
+    def __init__(self, output_path: str, fps: float):
+        if shutil.which("ffmpeg") is None:
+            raise RuntimeError("ffmpeg is required for WebM output")
+
+        self.output_path = output_path
+        self.fps = fps
+        self.process: Optional[subprocess.Popen] = None
+        self.size = None
+
+        # ffmpeg diagnostics go to a file so a full pipe can never stall the encoder
+        self.stderr = tempfile.TemporaryFile()
+
+    def _start(self, width: int, height: int):
+        self.size = (width, height)
+        self.process = subprocess.Popen(
+            [
+                "ffmpeg", "-y", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "bgra",
+                "-s", f"{width}x{height}", "-r", f"{self.fps:.3f}",
+                "-i", "-",
+                "-c:v", "libvpx-vp9", "-pix_fmt", "yuva420p",
+                "-b:v", "0", "-crf", "32", "-row-mt", "1",
+                "-auto-alt-ref", "0",
+                self.output_path
+            ],
+            stdin=subprocess.PIPE,
+            stderr=self.stderr
+        )
+
+    def write(self, frame: np.ndarray, mask: np.ndarray):
+        height, width = frame.shape[:2]
+        if self.process is None:
+            self._start(width, height)
+        elif (width, height) != self.size:
+            frame = cv2.resize(frame, self.size, interpolation=cv2.INTER_AREA)
+            mask = cv2.resize(mask, self.size, interpolation=cv2.INTER_LINEAR)
+
+        bgra = np.dstack((frame, mask))
+        self.process.stdin.write(bgra.tobytes())
+
+    def close(self):
+        try:
+            if self.process is None:
+                return
+            self.process.stdin.close()
+            if self.process.wait() != 0:
+                self.stderr.seek(0)
+                stderr = self.stderr.read(4096).decode(errors='ignore').strip()
+                raise RuntimeError(f"ffmpeg encoding failed: {stderr}")
+        finally:
+            self.stderr.close()
+
+    def abort(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.stderr.close()
+
+
+class _PNGSequenceWriter:
+    """Write RGBA frames as numbered PNGs into a ZIP archive"""
+
+    def __init__(self, output_path: str):
+        self.archive = zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_STORED)
+        self.index = 0
+
+    def write(self, frame: np.ndarray, mask: np.ndarray):
+        ok, encoded = cv2.imencode(".png", np.dstack((frame, mask)))
+        if not ok:
+            raise ValueError(f"Failed to encode frame {self.index}")
+
+        self.archive.writestr(f"frame_{self.index:06d}.png", encoded.tobytes())
+        self.index += 1
+
+    def close(self):
+        self.archive.close()
+
+    def abort(self):
+        self.archive.close()
@@ -0,0 +1,231 @@
+import asyncio
+import copy
+import os
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable, Deque, Iterable, Optional, Tuple
+from collections import deque
+
+class AdmissionController:
+    """Latency-SLO-driven admission control with per-plan quality downgrade and load shedding"""
+
+    # Quality levels from cheapest to most expensive
+    QUALITY_ORDER = ["low", "medium", "high"]
+
+    # Per-plan policies, as fractions of the SLO
+    # downgrade_at: pressure at which quality is capped to downgrade_to
+    # shed_at: pressure at which requests are rejected with 503
+    DEFAULT_POLICIES = {
+        "free": {
+            "downgrade_at": 0.6,
+            "downgrade_to": "low",
+            "shed_at": 0.9
+        },
+        "premium": {
+            "downgrade_at": 0.9,
+            "downgrade_to": "medium",
+            "shed_at": 1.5
+        },
+        "business": {
+            "downgrade_at": None,
+            "downgrade_to": None,
+            "shed_at": 2.0
+        }
+    }
+
+    def __init__(
+        self,
+        plans: Iterable[str],
+        slo_seconds: float = 8.0,
+        window_seconds: float = 60.0,
+        workers: Optional[int] = None,
+        policies: Optional[dict] = None,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.logger = logging.getLogger(__name__)
+
+        # Target end-to-end latency (queue wait + processing)
+        self.slo_seconds = slo_seconds
+
+        # Only samples newer than this contribute to the latency estimate
+        self.window_seconds = window_seconds
+
+        # Processing slots; requests beyond this wait in processing_slot()
+        self.workers = workers or os.cpu_count() or 1
+        self._slots: Optional[asyncio.Semaphore] = None
+
+        # Injectable clock so load can be simulated without sleeping
+        self.clock = clock
+
+        # Overrides are merged per plan on top of the defaults
+        self.policies = copy.deepcopy(self.DEFAULT_POLICIES)
+        for plan, overrides in (policies or {}).items():
+            self.policies.setdefault(plan, dict(self.DEFAULT_POLICIES["free"])).update(overrides)
+
+        for plan in plans:
+            if plan not in self.policies:
+                self.logger.warning(f"No admission policy for plan {plan}, using free policy")
+                self.policies[plan] = dict(self.policies["free"])
+
+        # Recent (timestamp, seconds) samples
+        self.wait_samples: Deque[Tuple[float, float]] = deque(maxlen=1000)
+        self.processing_samples: Deque[Tuple[float, float]] = deque(maxlen=1000)
+
+        # Admitted requests by stage
+        self.in_flight = 0
+        self.waiting = 0
+        self.running = 0
+
+        self.counters = {"admitted": 0, "downgraded": 0, "shed": 0}
+
+    def admit(self, plan: str = "free", quality: str = "high", record_latency: bool = True) -> dict:
+        """
+        Decide whether to run a request and at which quality
+
+        Args:
+            plan: User plan (free, premium, business)
+            quality: Requested processing quality (low, medium, high)
+            record_latency: Whether the processing time feeds the latency
+                estimate; long jobs such as video still occupy processing
+                slots, so their effect shows up as queue wait instead
+
+        Returns:
+            Decision with admitted flag, effective quality and tier
+            (full, downgraded, shed)
+        """
+        policy = self.policies.get(plan, self.policies["free"])
+        pressure = self.get_pressure()
+
+        if pressure >= policy["shed_at"]:
+            self.counters["shed"] += 1
+            self.logger.warning(f"Shedding {plan} request (SLO pressure {pressure:.2f})")
+            return {
+                "admitted": False,
+                "plan": plan,
+                "quality": quality,
+                "tier": "shed",
+                "retry_after": max(1, int(round(self.slo_seconds)))
+            }
+
+        tier = "full"
+        downgrade_at = policy["downgrade_at"]
+        if downgrade_at is not None and pressure >= downgrade_at:
+            capped = self._cap_quality(quality, policy["downgrade_to"])
+            if capped != quality:
+                self.logger.info(f"Downgrading {plan} request {quality} -> {capped} (SLO pressure {pressure:.2f})")
+                quality = capped
+                tier = "downgraded"
+                self.counters["downgraded"] += 1
+
+        self.in_flight += 1
+        self.counters["admitted"] += 1
+
+        return {
+            "admitted": True,
+            "plan": plan,
+            "quality": quality,
+            "tier": tier,
+            "record_latency": record_latency,
+            "queued_at": None,
+            "started_at": None
+        }
+
+    def enqueue(self, decision: dict):
+        """Mark an admitted request as waiting for a processing slot"""
+        decision["queued_at"] = self.clock()
+        self.waiting += 1
+
+    def start(self, decision: dict):
+        """Mark a queued request as holding a slot and record its queue wait"""
+        now = self.clock()
+        decision["started_at"] = now
+        self.waiting = max(0, self.waiting - 1)
+        self.running += 1
+        self.wait_samples.append((now, now - decision["queued_at"]))
+
+    def finish(self, decision: dict):
+        """Mark an admitted request as done and record its processing time"""
+        now = self.clock()
+        self.in_flight = max(0, self.in_flight - 1)
+
+        if decision.get("started_at") is not None:
+            self.running = max(0, self.running - 1)
+            if decision.get("record_latency", True):
+                self.processing_samples.append((now, now - decision["started_at"]))
+        elif decision.get("queued_at") is not None:
+            self.waiting = max(0, self.waiting - 1)
+
+    @asynccontextmanager
+    async def processing_slot(self, decision: dict):
+        """Hold one of the worker slots; queue wait is the time spent acquiring it"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers)
+
+        # If cancelled while queued, finish() settles the waiting count
+        self.enqueue(decision)
+        await self._slots.acquire()
+
+        try:
+            self.start(decision)
+            yield
+        finally:
+            self._slots.release()
+
+    def get_pressure(self) -> float:
+        """Estimated latency of a new request as a fraction of the SLO"""
+        return self.estimate_latency() / self.slo_seconds
+
+    def estimate_latency(self) -> float:
+        """Estimate end-to-end latency for a request admitted now"""
+        now = self.clock()
+        self._clean_old_samples(now)
+
+        waits = [seconds for _, seconds in self.wait_samples]
+        processing = [seconds for _, seconds in self.processing_samples]
+
+        processing_p95 = self._percentile(processing, 0.95)
+
+        # Requests already queued for a slot run ahead of this one
+        backlog_wait = 0.0
+        if self.running >= self.workers and processing:
+            mean_processing = sum(processing) / len(processing)
+            backlog_wait = mean_processing * (self.waiting + 1) / self.workers
+
+        return max(self._percentile(waits, 0.95), backlog_wait) + processing_p95
+
+    def get_stats(self) -> dict:
+        """Get current admission statistics"""
+        return {
+            "slo_seconds": self.slo_seconds,
+            "estimated_latency": round(self.estimate_latency(), 3),
+            "pressure": round(self.get_pressure(), 3),
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "running": self.running,
+            **self.counters
+        }
+
+    def _cap_quality(self, quality: str, ceiling: str) -> str:
+        """Lower quality to ceiling if it is more expensive"""
+        if quality not in self.QUALITY_ORDER:
+            return ceiling
+        if self.QUALITY_ORDER.index(quality) > self.QUALITY_ORDER.index(ceiling):
+            return ceiling
+        return quality
+
+    def _clean_old_samples(self, current_time: float):
+        """Remove samples outside the latency window"""
+        for samples in (self.wait_samples, self.processing_samples):
+            while samples and current_time - samples[0][0] > self.window_seconds:
+                samples.popleft()
+
+    @staticmethod
+    def _percentile(values: list, fraction: float) -> float:
+        """Nearest-rank percentile, 0 for no samples"""
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        index = min(len(ordered) - 1, int(fraction * len(ordered)))
+        return ordered[index]
@@ -1,6 +1,6 @@
 from fastapi import UploadFile
 import magic
-from typing import List
+from typing import List, Optional
 import logging
 
 class FileValidator:
@@ -23,6 +23,22 @@ class FileValidator:
             '.jpg', '.jpeg', '.png', '.gif', '.webp'
         ]
         
+        # Allowed video MIME types (ZIP archives hold image sequences)
+        self.allowed_video_types = [
+            'video/mp4',
+            'video/quicktime',
+            'video/webm',
+            'video/x-matroska',
+            'video/x-msvideo',
+            'application/zip',
+            'application/x-zip-compressed'
+        ]
+        
+        # Video file extensions
+        self.allowed_video_extensions = [
+            '.mp4', '.mov', '.webm', '.mkv', '.avi', '.zip'
+        ]
+        
         # Maximum file size (10MB)
         self.max_file_size = 10 * 1024 * 1024
     
@@ -45,15 +61,36 @@ class FileValidator:
             self.logger.error(f"File validation error: {e}")
             return False
     
-    def is_valid_size(self, file: UploadFile) -> bool:
+    def is_valid_video(self, file: UploadFile) -> bool:
+        """Check if uploaded file is a video clip or a ZIP of frames"""
+        try:
+            # Check file extension
+            if not self._has_valid_extension(file.filename, self.allowed_video_extensions):
+                self.logger.warning(f"Invalid video extension: {file.filename}")
+                return False
+            
+            # Check MIME type
+            if not self._has_valid_mime_type(file, self.allowed_video_types):
+                self.logger.warning(f"Invalid video MIME type: {file.content_type}")
+                return False
+            
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Video validation error: {e}")
+            return False
+    
+    def is_valid_size(self, file: UploadFile, max_size: Optional[int] = None) -> bool:
         """Check if file size is within limits"""
         try:
+            max_size = max_size or self.max_file_size
+            
             # Read file size
             file.file.seek(0, 2)  # Seek to end
             file_size = file.file.tell()
             file.file.seek(0)  # Reset to beginning
             
-            if file_size > self.max_file_size:
+            if file_size > max_size:
                 self.logger.warning(f"File too large: {file_size} bytes")
                 return False
             
@@ -63,7 +100,7 @@ class FileValidator:
             self.logger.error(f"Size validation error: {e}")
             return False
     
-    def _has_valid_extension(self, filename: str) -> bool:
+    def _has_valid_extension(self, filename: str, allowed_extensions: Optional[List[str]] = None) -> bool:
         """Check if filename has valid extension"""
         if not filename:
             return False
@@ -75,13 +112,15 @@ class FileValidator:
         else:
             extension = ''
         
-        return extension in self.allowed_extensions
+        return extension in (allowed_extensions or self.allowed_extensions)
     
-    def _has_valid_mime_type(self, file: UploadFile) -> bool:
+    def _has_valid_mime_type(self, file: UploadFile, allowed_types: Optional[List[str]] = None) -> bool:
         """Check if file has valid MIME type"""
         try:
+            allowed_types = allowed_types or self.allowed_types
+            
             # Check content type
-            if file.content_type and file.content_type.lower() in self.allowed_types:
+            if file.content_type and file.content_type.lower() in allowed_types:
                 return True
             
             # If content type is not available or invalid, check file magic
@@ -91,7 +130,7 @@ class FileValidator:
             
             mime_type = magic.from_buffer(file_content, mime=True)
             
-            return mime_type.lower() in self.allowed_types
+            return mime_type.lower() in allowed_types
             
         except Exception as e:
             self.logger.error(f"MIME type validation error: {e}")
@@ -0,0 +1,217 @@
+import asyncio
+
+import pytest
+
+from app.utils.admission_controller import AdmissionController
+
+
+class FakeClock:
+    """Manually advanced clock for simulating load without sleeping"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def make_controller(clock, **kwargs):
+    kwargs.setdefault("slo_seconds", 10.0)
+    kwargs.setdefault("window_seconds", 60.0)
+    kwargs.setdefault("workers", 1)
+    # Synthetic load is injected under a plan that is never shed or downgraded
+    kwargs.setdefault("policies", {"load": {"downgrade_at": None, "downgrade_to": None, "shed_at": float("inf")}})
+    return AdmissionController(["free", "premium", "business"], clock=clock, **kwargs)
+
+
+def simulate(controller, clock, processing_seconds, wait_seconds=0.0, count=1):
+    """Run completed requests through the controller with the given wait and processing times"""
+    for _ in range(count):
+        decision = controller.admit("load", "high")
+        assert decision["admitted"]
+        controller.enqueue(decision)
+        clock.advance(wait_seconds)
+        controller.start(decision)
+        clock.advance(processing_seconds)
+        controller.finish(decision)
+
+
+def tiers(controller):
+    """Admission tier each plan would get right now, without keeping requests in flight"""
+    result = {}
+    for plan in ("free", "premium", "business"):
+        decision = controller.admit(plan, "high")
+        if decision["admitted"]:
+            controller.finish(decision)
+        result[plan] = decision["tier"]
+    return result
+
+
+def test_idle_service_admits_everyone_at_full_quality():
+    controller = make_controller(FakeClock())
+
+    decision = controller.admit("free", "high")
+
+    assert decision["admitted"]
+    assert decision["tier"] == "full"
+    assert decision["quality"] == "high"
+
+
+@pytest.mark.parametrize("processing, expected", [
+    (3.0, {"free": "full", "premium": "full", "business": "full"}),
+    (7.0, {"free": "downgraded", "premium": "full", "business": "full"}),
+    (9.5, {"free": "shed", "premium": "downgraded", "business": "full"}),
+    (16.0, {"free": "shed", "premium": "shed", "business": "full"}),
+    (25.0, {"free": "shed", "premium": "shed", "business": "shed"}),
+])
+def test_policies_escalate_per_plan(processing, expected):
+    clock = FakeClock()
+    controller = make_controller(clock)
+
+    simulate(controller, clock, processing, count=5)
+
+    assert tiers(controller) == expected
+
+
+def test_downgrade_caps_quality_per_plan():
+    clock = FakeClock()
+    controller = make_controller(clock)
+    simulate(controller, clock, 9.5, count=5)
+
+    premium = controller.admit("premium", "high")
+    premium_low = controller.admit("premium", "low")
+
+    assert premium["quality"] == "medium"
+    assert premium_low["quality"] == "low"
+    assert premium_low["tier"] == "full"
+
+
+def test_queue_wait_counts_towards_pressure():
+    clock = FakeClock()
+    controller = make_controller(clock)
+
+    simulate(controller, clock, processing_seconds=2.0, wait_seconds=5.0, count=5)
+
+    assert controller.estimate_latency() == pytest.approx(7.0)
+    assert tiers(controller)["free"] == "downgraded"
+
+
+def test_shed_decision_reports_retry_after():
+    clock = FakeClock()
+    controller = make_controller(clock)
+    simulate(controller, clock, 30.0, count=3)
+
+    decision = controller.admit("free", "high")
+
+    assert not decision["admitted"]
+    assert decision["retry_after"] == 10
+    assert controller.counters["shed"] == 1
+
+
+def test_recovers_after_window_expires():
+    clock = FakeClock()
+    controller = make_controller(clock)
+    simulate(controller, clock, 30.0, count=3)
+    assert tiers(controller)["free"] == "shed"
+
+    clock.advance(61.0)
+
+    assert controller.estimate_latency() == 0.0
+    assert tiers(controller) == {"free": "full", "premium": "full", "business": "full"}
+
+
+def test_backlog_of_queued_requests_raises_pressure_before_samples_arrive():
+    clock = FakeClock()
+    controller = make_controller(clock, workers=2)
+    simulate(controller, clock, 2.0, count=5)
+    assert tiers(controller)["free"] == "full"
+
+    # Both slots busy and four requests queued behind them
+    running = [controller.admit("load") for _ in range(2)]
+    for decision in running:
+        controller.enqueue(decision)
+        controller.start(decision)
+    for _ in range(4):
+        controller.enqueue(controller.admit("load"))
+
+    # 2s * (4 + 1) / 2 workers of backlog on top of 2s processing
+    assert controller.estimate_latency() == pytest.approx(7.0)
+    assert tiers(controller)["free"] == "downgraded"
+
+
+def test_unrecorded_requests_do_not_add_processing_samples():
+    clock = FakeClock()
+    controller = make_controller(clock)
+
+    decision = controller.admit("free", "high", record_latency=False)
+    controller.enqueue(decision)
+    controller.start(decision)
+    clock.advance(300.0)
+    controller.finish(decision)
+
+    assert len(controller.processing_samples) == 0
+    assert controller.running == 0
+    assert controller.in_flight == 0
+
+
+def test_policy_overrides_and_unknown_plans():
+    clock = FakeClock()
+    controller = AdmissionController(
+        ["free", "enterprise"],
+        slo_seconds=10.0,
+        workers=1,
+        policies={
+            "free": {"shed_at": 0.5},
+            "load": {"downgrade_at": None, "downgrade_to": None, "shed_at": float("inf")}
+        },
+        clock=clock
+    )
+    simulate(controller, clock, 6.0, count=3)
+
+    assert controller.policies["free"]["downgrade_at"] == 0.6
+    assert controller.policies["enterprise"] == controller.policies["free"]
+    assert not controller.admit("free")["admitted"]
+    assert AdmissionController.DEFAULT_POLICIES["free"]["shed_at"] == 0.9
+
+
+def test_processing_slot_measures_wait_for_a_free_slot():
+    clock = FakeClock()
+    controller = make_controller(clock, workers=1)
+
+    async def scenario():
+        release = asyncio.Event()
+        first = controller.admit("free")
+        second = controller.admit("free")
+
+        async def hold():
+            async with controller.processing_slot(first):
+                await release.wait()
+                clock.advance(3.0)
+            controller.finish(first)
+
+        async def queued():
+            async with controller.processing_slot(second):
+                clock.advance(1.0)
+            controller.finish(second)
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(queued())
+        await asyncio.sleep(0)
+
+        assert controller.running == 1
+        assert controller.waiting == 1
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+
+    asyncio.run(scenario())
+
+    waits = [seconds for _, seconds in controller.wait_samples]
+    processing = [seconds for _, seconds in controller.processing_samples]
+    assert waits == [0.0, 3.0]
+    assert processing == [3.0, 1.0]
+    assert controller.in_flight == controller.waiting == controller.running == 0
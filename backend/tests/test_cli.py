@@ -0,0 +1,192 @@
+import json
+import multiprocessing
+import shutil
+
+import pytest
+
+from app import cli
+from app.cli import OutputNames, iter_sources, load_manifest, main, output_name, run
+
+# Workers inherit the monkeypatched pipeline only when forked
+requires_fork = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="fake pipeline is injected through fork inheritance"
+)
+
+
+class FakeRemover:
+    """Copies the input to the output as the processed image"""
+
+    def remove_background(self, input_path, output_path, quality):
+        shutil.copyfile(input_path, output_path)
+
+
+class FakeImageService:
+    """Treats any payload starting with 'bad' as an invalid image"""
+
+    def validate_image(self, data):
+        return not data.startswith(b"bad")
+
+    def convert_format(self, data, target_format):
+        return data
+
+
+def fake_pipeline():
+    return FakeRemover(), FakeImageService()
+
+
+def broken_pipeline():
+    raise RuntimeError("model failed to load")
+
+
+def read_manifest(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = tmp_path / "src"
+    (source / "sub").mkdir(parents=True)
+    for name, data in [
+        ("a.jpg", b"A"), ("b.jpg", b"B"), ("c.png", b"C"),
+        ("d.webp", b"D"), ("sub/e.jpg", b"E"), ("sub/f.png", b"F"),
+        # Same content as a.jpg under another name
+        ("sub/g.jpg", b"A"),
+    ]:
+        (source / name).write_bytes(data)
+    return source
+
+
+def test_output_name_strips_parent_and_absolute_components():
+    assert output_name("../../etc/a.jpg", "png") == "etc/a.png"
+    assert output_name("/abs/b.jpg", "webp") == "abs/b.webp"
+
+
+def test_output_names_disambiguate_same_stem():
+    names = OutputNames("png")
+
+    assert names.assign("a.png") == "a.png"
+    assert names.assign("a.jpg") == "a_jpg.png"
+    assert names.assign("a.png") == "a.png"
+
+
+def test_output_names_add_counter_when_extension_suffix_is_taken():
+    names = OutputNames("png")
+
+    assert names.assign("a.png") == "a.png"
+    assert names.assign("a.jpg") == "a_jpg.png"
+    assert names.assign("a.JPG") == "a_jpg_2.png"
+    assert names.assign("a.jpeg") == "a_jpeg.png"
+
+
+def test_load_manifest_keeps_latest_status_per_output(tmp_path):
+    manifest = tmp_path / "manifest.jsonl"
+    entries = [
+        {"name": "a.jpg", "sha256": "1", "output": "a.png", "status": "done"},
+        {"name": "b.jpg", "sha256": "2", "output": "b.png", "status": "done"},
+        {"name": "b.jpg", "sha256": "3", "output": "b.png", "status": "failed", "error": "x"},
+    ]
+    manifest.write_text("".join(json.dumps(entry) + "\n" for entry in entries) + '{"partial')
+
+    assert load_manifest(manifest) == {"a.png": "1"}
+
+
+def test_iter_sources_skips_output_directory(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"a")
+    (tmp_path / "out").mkdir()
+    (tmp_path / "out" / "a.png").write_bytes(b"processed")
+
+    names = [name for name, _ in iter_sources(tmp_path, exclude=tmp_path / "out")]
+
+    assert names == ["a.jpg"]
+
+
+@requires_fork
+def test_run_processes_copies_duplicates_and_resumes(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "_load_pipeline", fake_pipeline)
+    output = tmp_path / "out"
+    manifest = output / "manifest.jsonl"
+
+    # One worker keeps duplicate detection deterministic
+    stats = run(source, output, workers=1, prefetch=4, quality="high",
+                output_format="png", manifest_path=manifest)
+
+    assert stats == {"processed": 6, "copied": 1, "failed": 0, "skipped": 0}
+    entries = read_manifest(manifest)
+    assert sorted(entry["output"] for entry in entries) == [
+        "a.png", "b.png", "c.png", "d.png", "sub/e.png", "sub/f.png", "sub/g.png"
+    ]
+    assert all(entry["status"] == "done" for entry in entries)
+    assert [entry for entry in entries if "copied_from" in entry] == [{
+        "name": "sub/g.jpg",
+        "sha256": entries[0]["sha256"],
+        "output": "sub/g.png",
+        "status": "done",
+        "copied_from": "a.png"
+    }]
+    assert (output / "sub" / "g.png").read_bytes() == b"A"
+
+    stats = run(source, output, workers=2, prefetch=4, quality="high",
+                output_format="png", manifest_path=manifest)
+
+    assert stats == {"processed": 0, "copied": 0, "failed": 0, "skipped": 7}
+    assert len(read_manifest(manifest)) == 7
+
+
+@requires_fork
+def test_run_reprocesses_changed_content_and_missing_outputs(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "_load_pipeline", fake_pipeline)
+    output = tmp_path / "out"
+    manifest = output / "manifest.jsonl"
+    run(source, output, workers=2, prefetch=4, quality="high", output_format="png", manifest_path=manifest)
+
+    (source / "b.jpg").write_bytes(b"B2")
+    (output / "c.png").unlink()
+
+    stats = run(source, output, workers=2, prefetch=4, quality="high",
+                output_format="png", manifest_path=manifest)
+
+    assert stats == {"processed": 2, "copied": 0, "failed": 0, "skipped": 5}
+    assert (output / "b.png").read_bytes() == b"B2"
+
+
+@requires_fork
+def test_run_records_failures_in_manifest(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "_load_pipeline", fake_pipeline)
+    (source / "broken.png").write_bytes(b"bad data")
+    output = tmp_path / "out"
+
+    exit_code = main([str(source), str(output), "--workers", "2"])
+
+    assert exit_code == 1
+    failed = [entry for entry in read_manifest(output / "manifest.jsonl") if entry["status"] == "failed"]
+    assert failed == [{
+        "name": "broken.png",
+        "sha256": failed[0]["sha256"],
+        "output": "broken.png",
+        "status": "failed",
+        "error": "Invalid image file"
+    }]
+    assert not (output / "broken.png").exists()
+
+
+@requires_fork
+def test_main_succeeds_with_zero_exit(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "_load_pipeline", fake_pipeline)
+
+    assert main([str(source), str(tmp_path / "out"), "--workers", "2", "--format", "webp"]) == 0
+    assert (tmp_path / "out" / "sub" / "g.webp").exists()
+
+
+@requires_fork
+def test_main_exits_non_zero_when_worker_init_fails(source, tmp_path, monkeypatch):
+    monkeypatch.setattr(cli, "_load_pipeline", broken_pipeline)
+
+    assert main([str(source), str(tmp_path / "out"), "--workers", "2"]) == 1
+
+
+def test_main_rejects_unsupported_source(tmp_path):
+    source = tmp_path / "images.txt"
+    source.write_text("not an archive")
+
+    assert main([str(source), str(tmp_path / "out")]) == 2
@@ -0,0 +1,141 @@
+import tracemalloc
+
+import cv2
+import numpy as np
+import pytest
+
+from app.models.preprocessing import BufferPool, TensorPreprocessor
+
+MEAN = np.array([0.485, 0.456, 0.406])
+STD = np.array([0.229, 0.224, 0.225])
+
+
+@pytest.fixture
+def image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, (1080, 1920, 3), dtype=np.uint8)
+
+
+def naive_prepare(image, size=(320, 320)):
+    """Reference pipeline with a fresh array at every step"""
+    resized = cv2.resize(image[:, :, :3].copy(), size, interpolation=cv2.INTER_LINEAR)
+    normalised = (resized / 255.0 - MEAN) / STD
+    return normalised.transpose(2, 0, 1)[None].astype(np.float32)
+
+
+def naive_postprocess(prediction, size):
+    scaled = (prediction - prediction.min()) / (prediction.max() - prediction.min())
+    small = np.round(scaled * 255).astype(np.uint8)
+    return cv2.resize(small, size, interpolation=cv2.INTER_LINEAR)
+
+
+def peak_traced_bytes(fn, repeats=20):
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        for _ in range(repeats):
+            fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_prepare_matches_naive_pipeline(image):
+    preprocessor = TensorPreprocessor()
+
+    with preprocessor.prepared(image) as tensor:
+        assert tensor.shape == (1, 3, 320, 320)
+        assert tensor.dtype == np.float32
+        np.testing.assert_allclose(tensor, naive_prepare(image), atol=1e-5)
+
+
+def test_prepare_accepts_rgba(image):
+    preprocessor = TensorPreprocessor()
+    rgba = np.dstack((image, np.full(image.shape[:2], 7, dtype=np.uint8)))
+
+    with preprocessor.prepared(rgba) as tensor:
+        np.testing.assert_allclose(tensor, naive_prepare(image), atol=1e-5)
+
+
+def test_prepare_batch_returns_view_of_fixed_staging_buffer(image):
+    pool = BufferPool()
+    preprocessor = TensorPreprocessor(max_batch_size=4, pool=pool)
+    expected = naive_prepare(image)[0]
+
+    for size in (1, 3, 2, 4):
+        with preprocessor.prepared([image] * size) as batch:
+            assert batch.shape == (size, 3, 320, 320)
+            np.testing.assert_allclose(batch[-1], expected, atol=1e-5)
+
+    # One staging shape regardless of the batch sizes seen
+    assert pool.stats["allocations"] == 2
+    with pytest.raises(ValueError):
+        preprocessor.prepare_batch([image] * 5)
+
+
+def test_postprocess_matches_naive_pipeline():
+    preprocessor = TensorPreprocessor()
+    prediction = np.random.default_rng(1).random((1, 1, 320, 320), dtype=np.float32)
+    expected = naive_postprocess(prediction[0, 0].copy(), (1920, 1080))
+
+    mask = preprocessor.postprocess(prediction, (1920, 1080))
+
+    assert mask.shape == (1080, 1920)
+    assert mask.dtype == np.uint8
+    assert np.abs(mask.astype(int) - expected).max() <= 1
+
+
+def test_postprocess_handles_float64_and_constant_predictions():
+    preprocessor = TensorPreprocessor()
+    out = np.empty((50, 40), dtype=np.uint8)
+
+    prediction = np.linspace(0, 1, 320 * 320).reshape(320, 320)
+    expected = naive_postprocess(prediction.copy(), (40, 50))
+    mask = preprocessor.postprocess(prediction, (40, 50), out=out)
+    assert mask is out
+    assert np.abs(mask.astype(int) - expected).max() <= 1
+
+    constant = np.full((320, 320), 0.3, dtype=np.float32)
+    assert preprocessor.postprocess(constant, (40, 50)).max() == 0
+
+
+def test_steady_state_prepare_does_not_allocate(image):
+    pool = BufferPool()
+    preprocessor = TensorPreprocessor(pool=pool)
+    tensor_bytes = 3 * 320 * 320 * 4
+
+    def step():
+        with preprocessor.prepared(image):
+            pass
+
+    step()
+    allocations = pool.stats["allocations"]
+
+    peak = peak_traced_bytes(step)
+
+    assert pool.stats["allocations"] == allocations
+    assert peak < tensor_bytes // 10
+
+
+def test_steady_state_postprocess_does_not_allocate():
+    preprocessor = TensorPreprocessor()
+    prediction = np.random.default_rng(2).random((320, 320), dtype=np.float32)
+    out = np.empty((1080, 1920), dtype=np.uint8)
+
+    def step():
+        preprocessor.postprocess(prediction, (1920, 1080), out=out)
+
+    step()
+    peak = peak_traced_bytes(step)
+
+    assert peak < out.nbytes // 10
+
+
+def test_buffer_pool_bounds_idle_buffers():
+    pool = BufferPool(max_per_key=2)
+    buffers = [pool.acquire((4, 4), np.uint8) for _ in range(3)]
+    for buffer in buffers:
+        pool.release(buffer)
+
+    assert pool.stats == {"allocations": 3, "reuses": 0, "dropped": 1}
+    assert pool.acquire((4, 4), np.uint8) is buffers[1]
@@ -0,0 +1,166 @@
+import zipfile
+
+import cv2
+import numpy as np
+import pytest
+
+from app.services.video_service import VideoService
+
+
+class FakeRemover:
+    """Writes an RGBA PNG whose alpha keeps the bright pixels"""
+
+    def __init__(self, fail: bool = False):
+        self.calls = 0
+        self.fail = fail
+
+    def remove_background(self, input_path, output_path, quality):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("model crashed")
+        frame = cv2.imread(input_path)
+        alpha = np.where(frame.max(axis=2) > 128, 255, 0).astype(np.uint8)
+        cv2.imwrite(output_path, np.dstack((frame, alpha)))
+
+
+def square_frame(offset=0, size=(120, 160), value=255):
+    frame = np.zeros(size + (3,), dtype=np.uint8)
+    cv2.rectangle(frame, (40 + offset, 30), (80 + offset, 70), (value, value, value), -1)
+    return frame
+
+
+def write_sequence(path, frames, names=None):
+    names = names or [f"frame_{index:03d}.png" for index in range(len(frames))]
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, frame in zip(names, frames):
+            archive.writestr(name, cv2.imencode(".png", frame)[1].tobytes())
+    return str(path)
+
+
+def read_output(path):
+    with zipfile.ZipFile(path) as archive:
+        names = archive.namelist()
+        frames = [
+            cv2.imdecode(np.frombuffer(archive.read(name), np.uint8), cv2.IMREAD_UNCHANGED)
+            for name in names
+        ]
+    return names, frames
+
+
+def test_keyframes_by_interval_and_propagated_alpha(tmp_path):
+    frames = [square_frame(offset=index) for index in range(12)]
+    source = write_sequence(tmp_path / "in.zip", frames)
+    remover = FakeRemover()
+
+    stats = VideoService(remover, keyframe_interval=5).process(source, str(tmp_path / "out.zip"), "zip")
+
+    assert stats == {"frames": 12, "keyframes": 3, "propagated": 9}
+    assert remover.calls == 3
+
+    names, output = read_output(tmp_path / "out.zip")
+    assert names == [f"frame_{index:06d}.png" for index in range(12)]
+    for index, frame in enumerate(output):
+        assert frame.shape == (120, 160, 4)
+        # Inside the moved square is opaque, well outside it is transparent
+        assert frame[50, 60 + index, 3] == 255
+        assert frame[50, 10, 3] == 0
+        assert frame[100, 150, 3] == 0
+
+
+def test_motion_above_threshold_forces_keyframe(tmp_path):
+    frames = [square_frame()] * 3 + [square_frame(offset=60)] + [square_frame(offset=60)] * 2
+    source = write_sequence(tmp_path / "in.zip", frames)
+
+    stats = VideoService(FakeRemover(), keyframe_interval=30, motion_threshold=5.0).process(
+        source, str(tmp_path / "out.zip"), "zip"
+    )
+
+    assert stats == {"frames": 6, "keyframes": 2, "propagated": 4}
+    _, output = read_output(tmp_path / "out.zip")
+    assert output[3][50, 120, 3] == 255
+    assert output[3][50, 60, 3] == 0
+
+
+def test_frame_size_change_forces_keyframe(tmp_path):
+    frames = [square_frame(), square_frame(), square_frame(size=(90, 200)), square_frame(size=(90, 200))]
+    source = write_sequence(tmp_path / "in.zip", frames)
+
+    stats = VideoService(FakeRemover()).process(source, str(tmp_path / "out.zip"), "zip")
+
+    assert stats == {"frames": 4, "keyframes": 2, "propagated": 2}
+    _, output = read_output(tmp_path / "out.zip")
+    assert [frame.shape for frame in output] == [(120, 160, 4)] * 2 + [(90, 200, 4)] * 2
+
+
+def test_unpadded_frame_names_keep_numeric_order(tmp_path):
+    # Each frame's brightness encodes its index
+    frames = [square_frame(value=150 + 5 * index) for index in range(12)]
+    names = [f"frame_{index}.png" for index in range(12)]
+    source = write_sequence(tmp_path / "in.zip", frames, names=names)
+
+    VideoService(FakeRemover()).process(source, str(tmp_path / "out.zip"), "zip")
+
+    _, output = read_output(tmp_path / "out.zip")
+    assert [int(frame[50, 60, 0]) for frame in output] == [150 + 5 * index for index in range(12)]
+
+
+def test_max_frames_truncates_clip(tmp_path):
+    source = write_sequence(tmp_path / "in.zip", [square_frame()] * 8)
+
+    stats = VideoService(FakeRemover(), max_frames=5).process(source, str(tmp_path / "out.zip"), "zip")
+
+    assert stats["frames"] == 5
+    names, _ = read_output(tmp_path / "out.zip")
+    assert len(names) == 5
+
+
+def test_rejects_oversized_zip_entry(tmp_path):
+    source = write_sequence(tmp_path / "in.zip", [square_frame()])
+
+    with pytest.raises(ValueError, match="uncompressed"):
+        VideoService(FakeRemover(), max_frame_bytes=100).process(source, str(tmp_path / "out.zip"), "zip")
+
+
+def test_rejects_frame_above_max_dimension(tmp_path):
+    source = write_sequence(tmp_path / "in.zip", [square_frame(size=(120, 600))])
+    remover = FakeRemover()
+
+    with pytest.raises(ValueError, match="exceeds 512px"):
+        VideoService(remover, max_frame_dimension=512).process(source, str(tmp_path / "out.zip"), "zip")
+    assert remover.calls == 0
+
+
+def test_no_decodable_frames(tmp_path):
+    source = tmp_path / "in.zip"
+    with zipfile.ZipFile(source, "w") as archive:
+        archive.writestr("frame_0.png", b"not an image")
+        archive.writestr("notes.txt", b"ignored")
+
+    with pytest.raises(ValueError, match="No decodable frames"):
+        VideoService(FakeRemover()).process(str(source), str(tmp_path / "out.zip"), "zip")
+
+
+def test_unsupported_output_format(tmp_path):
+    source = write_sequence(tmp_path / "in.zip", [square_frame()])
+
+    with pytest.raises(ValueError, match="Unsupported"):
+        VideoService(FakeRemover()).process(source, str(tmp_path / "out.gif"), "gif")
+
+
+def test_timeout_stops_processing(tmp_path):
+    source = write_sequence(tmp_path / "in.zip", [square_frame()] * 3)
+
+    with pytest.raises(TimeoutError):
+        VideoService(FakeRemover(), timeout_seconds=-1).process(source, str(tmp_path / "out.zip"), "zip")
+
+
+def test_remover_failure_aborts_writer(tmp_path):
+    source = write_sequence(tmp_path / "in.zip", [square_frame()] * 3)
+    output = tmp_path / "out.zip"
+
+    with pytest.raises(RuntimeError, match="model crashed"):
+        VideoService(FakeRemover(fail=True)).process(source, str(output), "zip")
+
+    # The partial archive is closed and readable, with no frames written
+    names, _ = read_output(output)
+    assert names == []